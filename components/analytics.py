@@ -1,14 +1,48 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import numpy as np
+import re
+from components.common import categorize_descriptions, keyword_rules, frame_key
+
+# Plotly is imported inside the chart methods: simple_app only needs
+# compute_key_metrics from this module and shouldn't pay for it at startup
 
 class AnalyticsDashboard:
+    # Category keywords, checked in priority order (first match wins)
+    CATEGORY_KEYWORDS = {
+        'Groceries': ['grocery', 'safeway', 'walmart', 'kroger', 'trader joe', 'whole foods', 'costco', 'target'],
+        'Dining Out': ['restaurant', 'cafe', 'starbucks', 'mcdonald', 'pizza', 'burger', 'taco', 'subway', 'chipotle', 'kfc', 'domino'],
+        'Transportation': ['gas', 'fuel', 'chevron', 'shell', 'exxon', 'uber', 'lyft', 'taxi', 'parking'],
+        'Shopping': ['amazon', 'shopping', 'store', 'mall', 'ebay', 'best buy', 'home depot', 'lowes'],
+        'Banking & Fees': ['atm', 'withdrawal', 'bank', 'fee', 'overdraft', 'maintenance'],
+        'Entertainment': ['netflix', 'spotify', 'subscription', 'hulu', 'disney', 'amazon prime', 'youtube'],
+        'Healthcare': ['pharmacy', 'doctor', 'medical', 'hospital', 'cvs', 'walgreens', 'dental'],
+        'Utilities': ['electric', 'utility', 'phone', 'internet', 'cable', 'water', 'gas bill'],
+        'Income': ['salary', 'payroll', 'deposit', 'income', 'refund', 'interest', 'dividend'],
+        'Insurance': ['insurance', 'premium', 'policy'],
+        'Education': ['school', 'tuition', 'education', 'student', 'book'],
+    }
+    
+    # One alternation per category, in the same priority order
+    CATEGORY_RULES = keyword_rules(CATEGORY_KEYWORDS)
+    
     def __init__(self, transactions_df):
-        self.df = transactions_df.copy()
-        self.filtered_df = transactions_df.copy()
+        self.df = transactions_df
+        
+        if not transactions_df.empty:
+            # assign() gives the dashboard one owned frame with the category column
+            # computed up front; date filtering keeps it
+            self.df = transactions_df.assign(
+                category=categorize_descriptions(transactions_df['description'], AnalyticsDashboard.CATEGORY_RULES)
+            )
+            
+            # Sort once so any date range maps to a contiguous slice
+            if not self.df['date'].is_monotonic_increasing:
+                self.df.sort_values('date', inplace=True, ignore_index=True)
+            self._dates = self.df['date'].to_numpy(dtype='datetime64[ns]')
+        
+        self.filtered_df = self.df
     
     def render_analytics(self):
         """Render analytics dashboard"""
@@ -73,9 +107,16 @@ class AnalyticsDashboard:
                 start_date = datetime(today.year - 1, 1, 1).date()
                 end_date = datetime(today.year - 1, 12, 31).date()
         
-        # Filter dataframe
-        mask = (self.df['date'].dt.date >= start_date) & (self.df['date'].dt.date <= end_date)
-        self.filtered_df = self.df.loc[mask]
+        # Filter dataframe (binary search on the sorted dates, end date inclusive)
+        lo, hi = np.searchsorted(self._dates, [
+            np.datetime64(start_date, 'ns'),
+            np.datetime64(end_date + timedelta(days=1), 'ns')
+        ])
+        self.filtered_df = self.df.iloc[lo:hi]
+        
+        # Sign masks shared by every income/expense split of the filtered frame
+        self._amounts = self.filtered_df['amount'].to_numpy()
+        self._expense_mask = self._amounts < 0
         
         if self.filtered_df.empty:
             st.warning("No transactions found in the selected date range.")
@@ -86,11 +127,11 @@ class AnalyticsDashboard:
         if self.filtered_df.empty:
             return
         
-        # Calculate metrics
-        total_income = self.filtered_df[self.filtered_df['amount'] > 0]['amount'].sum()
-        total_expenses = abs(self.filtered_df[self.filtered_df['amount'] < 0]['amount'].sum())
-        net_amount = total_income - total_expenses
-        avg_transaction = self.filtered_df['amount'].mean()
+        metrics = compute_key_metrics(self._amounts)
+        total_income = metrics['total_income']
+        total_expenses = metrics['total_expenses']
+        net_amount = metrics['net_amount']
+        avg_transaction = metrics['avg_transaction']
         
         # Display metrics
         col1, col2, col3, col4 = st.columns(4)
@@ -125,21 +166,23 @@ class AnalyticsDashboard:
         """Render spending trend over time"""
         st.subheader("💸 Daily Spending Trend")
         
-        # Group by date and sum amounts
-        daily_data = self.filtered_df.groupby('date').agg({
-            'amount': 'sum'
-        }).reset_index()
+        daily_data = _daily_agg(self.filtered_df)
+        
+        # Split each day's net amount into income and expenses
+        net = daily_data['net'].to_numpy()
         
-        # Separate income and expenses
-        daily_data['expenses'] = daily_data['amount'].apply(lambda x: abs(x) if x < 0 else 0)
-        daily_data['income'] = daily_data['amount'].apply(lambda x: x if x > 0 else 0)
+        # Hand Plotly plain arrays rounded to cents; shorter floats mean a smaller JSON payload
+        dates = daily_data.index.to_numpy()
+        expenses = np.where(net < 0, -net, 0.0).round(2)
+        income = np.clip(net, 0.0, None).round(2)
         
+        import plotly.graph_objects as go
         fig = go.Figure()
         
         # Add expenses line
         fig.add_trace(go.Scatter(
-            x=daily_data['date'],
-            y=daily_data['expenses'],
+            x=dates,
+            y=expenses,
             mode='lines+markers',
             name='Expenses',
             line=dict(color='red', width=2)
@@ -147,8 +190,8 @@ class AnalyticsDashboard:
         
         # Add income line
         fig.add_trace(go.Scatter(
-            x=daily_data['date'],
-            y=daily_data['income'],
+            x=dates,
+            y=income,
             mode='lines+markers',
             name='Income',
             line=dict(color='green', width=2)
@@ -168,19 +211,21 @@ class AnalyticsDashboard:
         """Render category breakdown pie chart"""
         st.subheader("🏷️ Spending by Category")
         
-        # Categorize transactions
-        self.filtered_df['category'] = self.filtered_df['description'].apply(self._categorize_transaction)
-        
         # Only show expenses for pie chart
-        expenses = self.filtered_df[self.filtered_df['amount'] < 0].copy()
-        expenses['amount'] = expenses['amount'].abs()
-        
-        if expenses.empty:
+        mask = self._expense_mask
+        if not mask.any():
             st.info("No expense transactions found in selected period.")
             return
         
-        category_spending = expenses.groupby('category')['amount'].sum().reset_index()
+        category_spending = (
+            pd.Series(-self._amounts[mask], name='amount')
+            .groupby(self.filtered_df['category'].array[mask], observed=True)
+            .sum()
+            .rename_axis('category')
+            .reset_index()
+        )
         
+        import plotly.express as px
         fig = px.pie(
             category_spending,
             values='amount',
@@ -195,46 +240,39 @@ class AnalyticsDashboard:
         """Render monthly spending comparison"""
         st.subheader("📅 Monthly Comparison")
         
-        # Group by month
-        monthly_data = self.filtered_df.groupby(self.filtered_df['date'].dt.to_period('M')).agg({
-            'amount': ['sum', 'count']
-        }).round(2)
+        monthly = _monthly_agg(self.filtered_df)
         
+        monthly_data = monthly[['net', 'count']].round(2)
         monthly_data.columns = ['Net Amount', 'Transaction Count']
         monthly_data = monthly_data.reset_index()
-        monthly_data['date'] = monthly_data['date'].astype(str)
-        
-        # Split into income and expenses
-        monthly_income = self.filtered_df[self.filtered_df['amount'] > 0].groupby(
-            self.filtered_df['date'].dt.to_period('M')
-        )['amount'].sum()
         
-        monthly_expenses = self.filtered_df[self.filtered_df['amount'] < 0].groupby(
-            self.filtered_df['date'].dt.to_period('M')
-        )['amount'].sum().abs()
+        # Month labels are already 'YYYY-MM' strings; lay income and expenses out
+        # as one tidy frame so Plotly Express builds both bar series in one call
+        months = monthly.index.to_numpy()
+        tidy = pd.DataFrame({
+            'month': np.tile(months, 2),
+            'kind': np.repeat(['Income', 'Expenses'], len(months)),
+            'amount': np.concatenate([
+                monthly['income'].to_numpy(),
+                monthly['expenses'].to_numpy()
+            ]).round(2)
+        })
         
         # Create comparison chart
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            name='Income',
-            x=[str(idx) for idx in monthly_income.index],
-            y=monthly_income.values,
-            marker_color='green'
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='Expenses',
-            x=[str(idx) for idx in monthly_expenses.index],
-            y=monthly_expenses.values,
-            marker_color='red'
-        ))
+        import plotly.express as px
+        fig = px.bar(
+            tidy,
+            x='month',
+            y='amount',
+            color='kind',
+            barmode='group',
+            color_discrete_map={'Income': 'green', 'Expenses': 'red'},
+            labels={'month': 'Month', 'amount': 'Amount ($)'},
+            title="Monthly Income vs Expenses"
+        )
         
         fig.update_layout(
-            title="Monthly Income vs Expenses",
-            xaxis_title="Month",
-            yaxis_title="Amount ($)",
-            barmode='group',
+            legend_title_text='',
             height=400,
             template='plotly_white'
         )
@@ -252,24 +290,17 @@ class AnalyticsDashboard:
         
         st.subheader("🏷️ Detailed Category Analysis")
         
-        # Apply categorization
-        self.filtered_df['category'] = self.filtered_df['description'].apply(self._categorize_transaction)
-        
-        # Category summary
-        category_summary = self.filtered_df.groupby('category').agg({
-            'amount': ['sum', 'count', 'mean'],
-            'description': lambda x: x.value_counts().head(1).index[0] if not x.empty else ''
-        }).round(2)
-        
-        category_summary.columns = ['Total Amount', 'Transaction Count', 'Average Amount', 'Top Merchant']
-        category_summary = category_summary.sort_values('Total Amount')
-        
-        # Format the display
-        display_summary = category_summary.copy()
-        display_summary['Total Amount'] = display_summary['Total Amount'].apply(lambda x: f"${x:,.2f}")
-        display_summary['Average Amount'] = display_summary['Average Amount'].apply(lambda x: f"${x:,.2f}")
+        category_summary, category_std = _category_agg(self.filtered_df)
         
-        st.dataframe(display_summary, use_container_width=True)
+        # Amounts stay numeric; Streamlit formats them in the browser
+        st.dataframe(
+            category_summary,
+            column_config={
+                'Total Amount': st.column_config.NumberColumn(format='$%.2f'),
+                'Average Amount': st.column_config.NumberColumn(format='$%.2f')
+            },
+            use_container_width=True
+        )
         
         # Category insights
         st.subheader("💡 Category Insights")
@@ -300,59 +331,78 @@ class AnalyticsDashboard:
                 st.info(f"💰 **Highest average transaction:** {cat_name} (${abs(cat_avg):,.2f})")
             
             # Category with most variance
-            category_std = self.filtered_df.groupby('category')['amount'].std().fillna(0)
             highest_variance = category_std.nlargest(1)
             if not highest_variance.empty:
                 cat_name = highest_variance.index[0]
                 st.info(f"📊 **Most variable category:** {cat_name}")
+
+
+@st.cache_data(show_spinner=False)
+def compute_key_metrics(amounts):
+    """Total income, total expenses, net amount and average of an amount array"""
+    # Masked reductions over the sign bitmaps; no zero-filled temporaries
+    # (accumulating in float64 even when the amounts are stored as float32)
+    total_income = float(amounts[amounts > 0].sum(dtype=np.float64))
+    # abs() rather than negation: an empty sum would otherwise show as -0.00
+    total_expenses = float(abs(amounts[amounts < 0].sum(dtype=np.float64)))
     
-    def _categorize_transaction(self, description):
-        """Enhanced transaction categorization"""
-        desc_lower = description.lower()
-        
-        # Groceries & Food
-        if any(word in desc_lower for word in ['grocery', 'safeway', 'walmart', 'kroger', 'trader joe', 'whole foods', 'costco', 'target']):
-            return 'Groceries'
-        
-        # Restaurants & Dining
-        elif any(word in desc_lower for word in ['restaurant', 'cafe', 'starbucks', 'mcdonald', 'pizza', 'burger', 'taco', 'subway', 'chipotle', 'kfc', 'domino']):
-            return 'Dining Out'
-        
-        # Gas & Transportation
-        elif any(word in desc_lower for word in ['gas', 'fuel', 'chevron', 'shell', 'exxon', 'uber', 'lyft', 'taxi', 'parking']):
-            return 'Transportation'
-        
-        # Shopping & Retail
-        elif any(word in desc_lower for word in ['amazon', 'shopping', 'store', 'mall', 'ebay', 'best buy', 'home depot', 'lowes']):
-            return 'Shopping'
-        
-        # ATM & Banking
-        elif any(word in desc_lower for word in ['atm', 'withdrawal', 'bank', 'fee', 'overdraft', 'maintenance']):
-            return 'Banking & Fees'
-        
-        # Entertainment & Subscriptions
-        elif any(word in desc_lower for word in ['netflix', 'spotify', 'subscription', 'hulu', 'disney', 'amazon prime', 'youtube']):
-            return 'Entertainment'
-        
-        # Healthcare
-        elif any(word in desc_lower for word in ['pharmacy', 'doctor', 'medical', 'hospital', 'cvs', 'walgreens', 'dental']):
-            return 'Healthcare'
-        
-        # Utilities & Bills
-        elif any(word in desc_lower for word in ['electric', 'utility', 'phone', 'internet', 'cable', 'water', 'gas bill']):
-            return 'Utilities'
-        
-        # Income & Deposits
-        elif any(word in desc_lower for word in ['salary', 'payroll', 'deposit', 'income', 'refund', 'interest', 'dividend']):
-            return 'Income'
-        
-        # Insurance
-        elif any(word in desc_lower for word in ['insurance', 'premium', 'policy']):
-            return 'Insurance'
-        
-        # Education
-        elif any(word in desc_lower for word in ['school', 'tuition', 'education', 'student', 'book']):
-            return 'Education'
-        
-        else:
-            return 'Other'
\ No newline at end of file
+    return {
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'net_amount': total_income - total_expenses,
+        'avg_transaction': float(np.nanmean(amounts, dtype=np.float64)) if amounts.size else 0.0
+    }
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_key})
+def _daily_agg(df):
+    """Net, count, income and expenses per day in a single pass over the rows"""
+    amounts = df['amount']
+    return pd.DataFrame({
+        'date': df['date'],
+        'amount': amounts,
+        'income': amounts.where(amounts > 0, 0.0),
+        'expenses': (-amounts).where(amounts < 0, 0.0)
+    }).groupby('date').agg(
+        net=('amount', 'sum'),
+        count=('amount', 'count'),
+        income=('income', 'sum'),
+        expenses=('expenses', 'sum')
+    )
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_key})
+def _monthly_agg(df):
+    """Monthly totals rolled up from the (much smaller) daily aggregate"""
+    daily = _daily_agg(df)
+    
+    # Truncating to datetime64[M] is a plain NumPy cast, and the 'YYYY-MM'
+    # labels double as display strings and sort chronologically
+    months = np.datetime_as_string(daily.index.to_numpy().astype('datetime64[M]'), unit='M')
+    return daily.groupby(pd.Index(months, name='date')).sum()
+
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_key})
+def _category_agg(df):
+    """Per-category summary table and amount standard deviation"""
+    category_summary = df.groupby('category', observed=True).agg({
+        'amount': ['sum', 'count', 'mean']
+    }).round(2)
+    
+    category_summary.columns = ['Total Amount', 'Transaction Count', 'Average Amount']
+    
+    # Most frequent description per category: count pairs once, then keep the
+    # highest count per category instead of a value_counts() callback per group
+    top_merchants = (
+        df.groupby(['category', 'description'], observed=True).size()
+        .reset_index(name='count')
+        .sort_values('count', kind='stable')
+        .drop_duplicates('category', keep='last')
+        .set_index('category')['description']
+    )
+    category_summary['Top Merchant'] = top_merchants
+    category_summary = category_summary.sort_values('Total Amount')
+    
+    category_std = df.groupby('category', observed=True)['amount'].std().fillna(0)
+    
+    return category_summary, category_std
\ No newline at end of file
@@ -0,0 +1,52 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import re
+
+# Keywords for the category pie chart, in priority order
+CATEGORY_KEYWORDS = {
+    'Groceries': ['grocery', 'safeway', 'walmart', 'kroger'],
+    'Dining': ['restaurant', 'cafe', 'starbucks', 'mcdonald', 'pizza'],
+    'Gas': ['gas', 'fuel', 'chevron', 'shell'],
+    'Shopping': ['amazon', 'target', 'shopping'],
+    'Cash': ['atm', 'withdrawal'],
+    'Subscriptions': ['netflix', 'spotify', 'subscription']
+}
+
+# Columns whose contents feed the cached transaction aggregates
+_KEY_COLUMNS = ('date', 'amount', 'description', 'category', 'transaction_type')
+
+def frame_hash(obj):
+    """Content hash of a DataFrame or Series, for st.cache_data hash_funcs"""
+    # Streamlit's default hashing samples large frames; this reads every row
+    return int(pd.util.hash_pandas_object(obj, index=False).sum())
+
+def frame_key(df):
+    """Cache key for a transactions frame: its length and the aggregated columns' contents"""
+    cols = [col for col in _KEY_COLUMNS if col in df.columns]
+    return (len(df), tuple(cols), frame_hash(df[cols]))
+
+def keyword_rules(keywords_by_category):
+    """(category, regex) pairs matching any of each category's literal keywords"""
+    return tuple(
+        (category, '|'.join(map(re.escape, keywords)))
+        for category, keywords in keywords_by_category.items()
+    )
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.Series: frame_hash})
+def categorize_descriptions(descriptions, rules=keyword_rules(CATEGORY_KEYWORDS)):
+    """Categorize descriptions by the first matching (category, regex) rule, else 'Other'"""
+    # Statements repeat the same merchants heavily, so match each distinct
+    # description once and broadcast the result back to every row
+    row_codes, uniques = pd.factorize(descriptions, use_na_sentinel=False)
+    lowered = pd.Series(uniques).astype(str).str.lower()
+    
+    # First matching category wins, mirroring the keyword priority order
+    masks = [lowered.str.contains(pattern, regex=True, na=False).to_numpy() for _, pattern in rules]
+    codes = np.select(masks, list(range(len(masks))), default=len(masks))
+    
+    # Categorical keeps small integer codes instead of one string per row
+    categories = pd.Categorical.from_codes(
+        codes[row_codes], categories=[category for category, _ in rules] + ['Other']
+    )
+    return pd.Series(categories, index=descriptions.index)
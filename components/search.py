@@ -1,31 +1,119 @@
 import streamlit as st
-import chromadb
-from chromadb.utils import embedding_functions
 import pandas as pd
 import numpy as np
 import re
 from datetime import datetime, timedelta
 import json
+import functools
+from io import BytesIO
 from pathlib import Path
-from config.settings import DATABASE_DIR, CHROMA_COLLECTION_NAME, EMBEDDING_MODEL
+from components.common import categorize_descriptions, keyword_rules, frame_hash
+from config.settings import DATABASE_DIR, CHROMA_COLLECTION_NAME, EMBEDDING_MODEL, EMBEDDING_BACKEND
+
+# Amount filters recognised in natural language queries, as one alternation
+_AMOUNT_RE = re.compile(
+    r'(?:(?P<min_over>over|above|more\s+than)|(?P<max_under>under|below|less\s+than))'
+    r'\s+\$?(?P<amt>\d+(?:,\d+)*(?:\.\d{2})?)'
+)
+
+# Category keywords in priority order; the first category with a hit wins
+_CATEGORY_KEYWORDS = {
+    'Groceries': ['grocery', 'safeway', 'walmart', 'kroger', 'trader joe', 'whole foods'],
+    'Dining': ['restaurant', 'cafe', 'starbucks', 'mcdonald', 'pizza', 'burger', 'taco', 'subway', 'chipotle'],
+    'Transportation': ['gas', 'fuel', 'chevron', 'shell', 'uber', 'lyft', 'taxi'],
+    'Shopping': ['amazon', 'target', 'shopping', 'store', 'mall', 'ebay'],
+    'Banking': ['atm', 'withdrawal', 'bank', 'fee'],
+    'Entertainment': ['netflix', 'spotify', 'subscription', 'hulu', 'disney'],
+    'Healthcare': ['pharmacy', 'doctor', 'medical', 'hospital', 'cvs', 'walgreens'],
+    'Utilities': ['electric', 'utility', 'phone', 'internet', 'cable'],
+    'Income': ['salary', 'payroll', 'deposit', 'income', 'refund']
+}
+
+# One alternation per category, in the same priority order
+_CATEGORY_RULES = keyword_rules(_CATEGORY_KEYWORDS)
+
+# Upsert batch size for Chroma clients that don't expose max_batch_size
+DEFAULT_UPSERT_BATCH_SIZE = 5000
+
+# Label lookup tables indexed by 0/1 classification codes
+_SIGN_LABELS = np.array(['expense', 'income'])
+_SIZE_LABELS = np.array(['small', 'large'])
+_YES_NO = np.array(['no', 'yes'])
+
+# Bumped whenever the stored metadata fields change, so rows indexed under
+# an older layout get fresh ids and are re-added instead of silently reused
+_INDEX_SCHEMA_VERSION = 3
+
+@functools.lru_cache(maxsize=1)
+def _get_embedding_function():
+    """Load the configured embedding function once per process"""
+    from chromadb.utils import embedding_functions
+    if EMBEDDING_BACKEND == "onnx":
+        # Chroma's bundled ONNX export of all-MiniLM-L6-v2; skips the torch stack
+        return embedding_functions.ONNXMiniLM_L6_V2()
+    return embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=EMBEDDING_MODEL
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_rag_system():
+    """Shared BankStatementRAG instance, kept across Streamlit reruns"""
+    return BankStatementRAG()
+
+def _epoch_days(day):
+    """Days since 1970-01-01, the integer form dates are indexed under"""
+    return int(np.datetime64(day, 'D').astype(np.int64))
+
+# Export bytes are cached on the results frame, so reruns that don't change
+# the results (slider moves, other buttons) skip re-serialization
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_hash})
+def _to_csv_bytes(df):
+    """Serialize a frame to CSV bytes"""
+    # pandas' writer, not Arrow's: Arrow writes midnight timestamps in full,
+    # booleans in lowercase and quotes every string, changing the export
+    return df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_hash})
+def _to_excel_bytes(query, df, searched_at):
+    """Serialize search results plus a summary sheet to an Excel workbook"""
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Search Results', index=False)
+        
+        # Add summary sheet
+        summary_data = {
+            'Query': [query],
+            'Results Count': [len(df)],
+            'Total Amount': [df['amount'].sum()],
+            'Average Amount': [df['amount'].mean()],
+            # Passed in rather than read here, so a cache hit can't replay a stale time
+            'Search Date': [searched_at]
+        }
+        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+    
+    return buffer.getvalue()
 
 class BankStatementRAG:
     def __init__(self):
         self.client = None
         self.collection = None
         self.transactions_df = pd.DataFrame()
+        # Memoized per instance; cleared whenever the index changes
+        self._cached_query = functools.lru_cache(maxsize=128)(self._query_collection)
         self._initialize_chromadb()
     
     def _initialize_chromadb(self):
         """Initialize ChromaDB client and collection"""
         try:
+            # Imported lazily: chromadb and the embedding stack behind it take
+            # seconds to load and nothing else in this module needs them
+            import chromadb
+            
             # Create ChromaDB client with persistent storage
             self.client = chromadb.PersistentClient(path=str(DATABASE_DIR))
             
-            # Initialize embedding function
-            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=EMBEDDING_MODEL
-            )
+            # Initialize embedding function (model is loaded once per process)
+            self.embedding_function = _get_embedding_function()
             
             # Try to get existing collection or create new one
             try:
@@ -53,79 +141,109 @@ class BankStatementRAG:
         
         try:
             with st.spinner("🔄 Creating semantic search index..."):
-                # Clear existing data
-                try:
-                    self.client.delete_collection(CHROMA_COLLECTION_NAME)
-                except:
-                    pass
-                
-                # Create fresh collection
-                self.collection = self.client.create_collection(
+                # Reuse the existing collection; only the difference is re-embedded
+                self.collection = self.client.get_or_create_collection(
                     name=CHROMA_COLLECTION_NAME,
                     embedding_function=self.embedding_function
                 )
                 
-                # Prepare documents for embedding
-                documents = []
-                metadatas = []
-                ids = []
+                ids = self._transaction_ids(transactions_df)
+                existing = set(self.collection.get(include=[])['ids'])
                 
-                for idx, row in transactions_df.iterrows():
-                    # Create rich document for embedding
-                    doc = self._create_document_text(row)
-                    documents.append(doc)
-                    
-                    # Create metadata
-                    metadata = {
-                        "date": str(row['date'].date()),
-                        "description": row['description'],
-                        "amount": float(row['amount']),
-                        "month": str(row['month']),
-                        "year": int(row['year']),
-                        "transaction_type": row['transaction_type'],
-                        "source_file": row['source_file'],
-                        "day_of_week": row['day_of_week'],
-                        "is_weekend": bool(row['is_weekend'])
-                    }
-                    metadatas.append(metadata)
-                    ids.append(f"tx_{idx}")
+                # Drop transactions that are no longer part of the upload
+                stale = list(existing.difference(ids))
+                if stale:
+                    self.collection.delete(ids=stale)
+                
+                is_new = np.fromiter((i not in existing for i in ids), dtype=bool, count=len(ids))
+                new_df = transactions_df[is_new]
+                new_ids = [i for i, new in zip(ids, is_new) if new]
                 
-                # Add to ChromaDB in batches to avoid memory issues
-                batch_size = 100
-                for i in range(0, len(documents), batch_size):
-                    batch_docs = documents[i:i+batch_size]
-                    batch_metadata = metadatas[i:i+batch_size]
-                    batch_ids = ids[i:i+batch_size]
+                if new_ids:
+                    # Prepare documents and metadata for the new rows at once
+                    documents = self._create_documents(new_df)
+                    metadatas = self._create_metadatas(new_df)
+                    
+                    # Embed everything in one call so the sentence-transformer can
+                    # length-sort the whole corpus into evenly padded batches
+                    embeddings = self.embedding_function(documents)
                     
-                    self.collection.add(
-                        documents=batch_docs,
-                        metadatas=batch_metadata,
-                        ids=batch_ids
-                    )
+                    # Upsert in one call when it fits, otherwise in the largest batches
+                    # the client accepts (SQLite caps variables per statement); upsert
+                    # keeps a half-finished earlier run from failing on duplicate ids.
+                    # Clients that don't report a limit get a conservative fixed one
+                    batch_size = min(len(documents), getattr(self.client, 'max_batch_size', None) or DEFAULT_UPSERT_BATCH_SIZE)
+                    for i in range(0, len(documents), batch_size):
+                        self.collection.upsert(
+                            documents=documents[i:i+batch_size],
+                            embeddings=embeddings[i:i+batch_size],
+                            metadatas=metadatas[i:i+batch_size],
+                            ids=new_ids[i:i+batch_size]
+                        )
                 
-                st.success(f"✅ Indexed {len(documents)} transactions for semantic search")
+                self._cached_query.cache_clear()
+                
+                st.success(
+                    f"✅ Indexed {len(ids)} transactions for semantic search "
+                    f"({len(new_ids)} new, {len(ids) - len(new_ids)} reused)"
+                )
                 return True
                 
         except Exception as e:
             st.error(f"Failed to index transactions: {str(e)}")
             return False
     
-    def _create_document_text(self, row):
-        """Create rich text document for embedding"""
+    def _transaction_ids(self, df):
+        """Deterministic content-hash ids, so unchanged rows keep their embeddings"""
+        hashes = pd.util.hash_pandas_object(df[['date', 'description', 'amount']], index=False)
+        # Repeated identical transactions are numbered to keep ids unique
+        occurrence = hashes.groupby(hashes.to_numpy()).cumcount()
+        return [
+            f"tx{_INDEX_SCHEMA_VERSION}_{h:016x}_{n}"
+            for h, n in zip(hashes.to_numpy().tolist(), occurrence.to_numpy().tolist())
+        ]
+    
+    def _create_metadatas(self, df):
+        """Create ChromaDB metadata records, one per row"""
+        amounts = df['amount'].to_numpy(dtype=float)
+        columns = {
+            "date_epoch": df['date'].to_numpy(dtype='datetime64[D]').astype(np.int64),
+            "description": df['description'].to_numpy(),
+            "amount": amounts,
+            "abs_amount": np.abs(amounts),
+            "month": df['date'].dt.strftime('%Y-%m').to_numpy(),
+            "year": df['year'].to_numpy(dtype=int),
+            "transaction_type": df['transaction_type'].to_numpy(),
+            "source_file": df['source_file'].to_numpy(),
+            "day_of_week": df['day_of_week'].to_numpy(),
+            "is_weekend": df['is_weekend'].to_numpy(dtype=bool)
+        }
+        
+        # Column arrays -> native Python lists once, then one dict per row
+        keys = list(columns)
+        return [
+            dict(zip(keys, values))
+            for values in zip(*(column.tolist() for column in columns.values()))
+        ]
+    
+    def _create_documents(self, df):
+        """Create rich text documents for embedding, one per row"""
         # Create descriptive text that includes context
-        amount_desc = "income" if row['amount'] > 0 else "expense"
-        amount_size = "large" if abs(row['amount']) > 100 else "small"
-        
-        doc = f"""
-        Transaction: {row['description']}
-        Amount: ${row['amount']:.2f} ({amount_desc}, {amount_size})
-        Date: {row['date'].strftime('%B %d, %Y')} ({row['day_of_week']})
-        Month: {row['date'].strftime('%B %Y')}
-        Type: {row['transaction_type']}
-        Weekend: {'yes' if row['is_weekend'] else 'no'}
-        """.strip()
-        
-        return doc
+        amounts = df['amount'].to_numpy(dtype=float)
+        amount_desc = _SIGN_LABELS[(amounts > 0).view(np.uint8)]
+        amount_size = _SIZE_LABELS[(np.abs(amounts) > 100).view(np.uint8)]
+        weekend = _YES_NO[df['is_weekend'].to_numpy(dtype=bool).view(np.uint8)]
+        
+        docs = (
+            'Transaction: ' + df['description'].astype(str)
+            + '\nAmount: $' + np.char.mod('%.2f', amounts) + ' (' + amount_desc + ', ' + amount_size + ')'
+            + '\nDate: ' + df['date'].dt.strftime('%B %d, %Y') + ' (' + df['day_of_week'].astype(str) + ')'
+            + '\nMonth: ' + df['date'].dt.strftime('%B %Y')
+            + '\nType: ' + df['transaction_type'].astype(str)
+            + '\nWeekend: ' + weekend
+        )
+        
+        return docs.tolist()
     
     def search(self, query, n_results=20, filters=None):
         """Search transactions using natural language query"""
@@ -142,11 +260,11 @@ class BankStatementRAG:
             # Build ChromaDB query
             where_clause = self._build_where_clause(extracted_filters)
             
-            # Perform semantic search
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=min(n_results, 100),  # Limit for performance
-                where=where_clause if where_clause else None
+            # Perform semantic search (repeated queries are served from cache)
+            results = self._cached_query(
+                query,
+                min(n_results, 100),  # Limit for performance
+                json.dumps(where_clause if where_clause else None, sort_keys=True)
             )
             
             if not results['ids'] or not results['ids'][0]:
@@ -164,27 +282,24 @@ class BankStatementRAG:
             st.error(f"Search failed: {str(e)}")
             return pd.DataFrame()
     
+    def _query_collection(self, query, n_results, where_json):
+        """Embed the query and run the ANN lookup against the collection"""
+        return self.collection.query(
+            query_texts=[query],
+            n_results=n_results,
+            where=json.loads(where_json)
+        )
+    
     def _extract_query_filters(self, query):
         """Extract filters from natural language query"""
         filters = {}
         query_lower = query.lower()
         
         # Extract amount filters
-        amount_patterns = [
-            (r'over\s+\$?(\d+(?:,\d+)*(?:\.\d{2})?)', 'amount_min'),
-            (r'above\s+\$?(\d+(?:,\d+)*(?:\.\d{2})?)', 'amount_min'),
-            (r'more\s+than\s+\$?(\d+(?:,\d+)*(?:\.\d{2})?)', 'amount_min'),
-            (r'under\s+\$?(\d+(?:,\d+)*(?:\.\d{2})?)', 'amount_max'),
-            (r'below\s+\$?(\d+(?:,\d+)*(?:\.\d{2})?)', 'amount_max'),
-            (r'less\s+than\s+\$?(\d+(?:,\d+)*(?:\.\d{2})?)', 'amount_max')
-        ]
-        
-        for pattern, filter_type in amount_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                amount = float(match.group(1).replace(',', ''))
-                filters[filter_type] = amount
-                break
+        match = _AMOUNT_RE.search(query_lower)
+        if match:
+            filter_type = 'amount_min' if match.group('min_over') else 'amount_max'
+            filters[filter_type] = float(match.group('amt').replace(',', ''))
         
         # Extract time filters
         if 'last month' in query_lower:
@@ -222,17 +337,17 @@ class BankStatementRAG:
         
         where_conditions = []
         
-        # Amount filters
+        # Amount filters (on magnitude, so they apply to debits as well)
         if 'amount_min' in filters:
-            where_conditions.append({"amount": {"$gte": filters['amount_min']}})
+            where_conditions.append({"abs_amount": {"$gte": filters['amount_min']}})
         if 'amount_max' in filters:
-            where_conditions.append({"amount": {"$lte": filters['amount_max']}})
+            where_conditions.append({"abs_amount": {"$lte": filters['amount_max']}})
         
-        # Date filters
+        # Date filters (stored as integer days since the epoch)
         if 'date_start' in filters:
-            where_conditions.append({"date": {"$gte": str(filters['date_start'])}})
+            where_conditions.append({"date_epoch": {"$gte": _epoch_days(filters['date_start'])}})
         if 'date_end' in filters:
-            where_conditions.append({"date": {"$lte": str(filters['date_end'])}})
+            where_conditions.append({"date_epoch": {"$lte": _epoch_days(filters['date_end'])}})
         
         # Year filter
         if 'year' in filters:
@@ -256,15 +371,16 @@ class BankStatementRAG:
             return df
         
         # Convert metadata back to proper types
-        df['date'] = pd.to_datetime(df['date'])
+        # (DataFrame.pop takes no default, so check for the column first)
+        epoch = df.pop('date_epoch') if 'date_epoch' in df.columns else None
+        dates = pd.to_datetime(epoch, unit='D') if epoch is not None else None
+        if 'date' in df.columns:
+            # Rows indexed under the old schema carry only a 'YYYY-MM-DD' string
+            legacy = pd.to_datetime(df['date'], errors='coerce')
+            dates = legacy if dates is None else dates.fillna(legacy)
+        df['date'] = dates
         df['amount'] = df['amount'].astype(float)
         
-        # Apply amount filters if they exist
-        if 'amount_min' in filters:
-            df = df[abs(df['amount']) >= filters['amount_min']]
-        if 'amount_max' in filters:
-            df = df[abs(df['amount']) <= filters['amount_max']]
-        
         return df
     
     def _results_to_dataframe(self, results):
@@ -274,15 +390,16 @@ class BankStatementRAG:
         
         # Extract metadata
         metadata_list = results['metadatas'][0]
-        distances = results['distances'][0] if results.get('distances') else [0] * len(metadata_list)
+        distances = np.asarray(
+            results['distances'][0] if results.get('distances') else np.zeros(len(metadata_list)),
+            dtype=np.float64
+        )
         
         # Create DataFrame
         df = pd.DataFrame(metadata_list)
-        df['similarity_score'] = [1 - d for d in distances]  # Convert distance to similarity
-        
-        # Sort by similarity
-        df = df.sort_values('similarity_score', ascending=False)
+        df['similarity_score'] = 1.0 - distances  # Convert distance to similarity
         
+        # Chroma already returns nearest neighbours first, i.e. by similarity
         return df
 
 class SearchInterface:
@@ -355,16 +472,17 @@ class SearchInterface:
                 return
             
             # Add to query history
+            searched_at = datetime.now()
             self.query_history.append({
                 'query': query,
                 'results_count': len(results),
-                'timestamp': datetime.now()
+                'timestamp': searched_at
             })
             
             # Display results
-            self._display_search_results(query, results)
+            self._display_search_results(query, results, searched_at)
     
-    def _display_search_results(self, query, results_df):
+    def _display_search_results(self, query, results_df, searched_at):
         """Display search results with summary and details"""
         # Results summary
         st.success(f"Found {len(results_df)} matching transactions")
@@ -388,25 +506,29 @@ class SearchInterface:
         st.subheader("📋 Search Results")
         
         # Prepare display dataframe
-        display_df = results_df.copy()
-        display_df['Date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
-        display_df['Description'] = display_df['description']
-        display_df['Amount'] = display_df['amount'].apply(lambda x: f"${x:,.2f}")
-        display_df['Type'] = display_df['transaction_type']
-        display_df['Relevance'] = display_df['similarity_score'].apply(lambda x: f"{x:.2f}")
-        
-        # Select columns to display
-        columns_to_show = ['Date', 'Description', 'Amount', 'Type', 'Relevance']
+        display_df = pd.DataFrame({
+            'Date': pd.to_datetime(results_df['date']).dt.strftime('%Y-%m-%d'),
+            'Description': results_df['description'],
+            'Amount': results_df['amount'],
+            'Type': results_df['transaction_type'],
+            'Relevance': results_df['similarity_score']
+        })
+        
+        # Numbers stay numeric; the frontend formats them
         st.dataframe(
-            display_df[columns_to_show],
+            display_df,
+            column_config={
+                'Amount': st.column_config.NumberColumn(format='$%.2f'),
+                'Relevance': st.column_config.NumberColumn(format='%.2f')
+            },
             use_container_width=True,
             height=400
         )
         
         # Export options
-        self._show_export_options(query, results_df)
+        self._show_export_options(query, results_df, searched_at)
     
-    def _show_export_options(self, query, results_df):
+    def _show_export_options(self, query, results_df, searched_at):
         """Show export options for search results"""
         st.subheader("📤 Export Results")
         
@@ -414,7 +536,7 @@ class SearchInterface:
         
         with col1:
             # CSV export
-            csv = results_df.to_csv(index=False)
+            csv = _to_csv_bytes(results_df)
             st.download_button(
                 "📄 Download CSV",
                 csv,
@@ -424,24 +546,9 @@ class SearchInterface:
         
         with col2:
             # Excel export
-            from io import BytesIO
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                results_df.to_excel(writer, sheet_name='Search Results', index=False)
-                
-                # Add summary sheet
-                summary_data = {
-                    'Query': [query],
-                    'Results Count': [len(results_df)],
-                    'Total Amount': [results_df['amount'].sum()],
-                    'Average Amount': [results_df['amount'].mean()],
-                    'Search Date': [datetime.now().strftime('%Y-%m-%d %H:%M:%S')]
-                }
-                pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
-            
             st.download_button(
                 "📊 Download Excel",
-                buffer.getvalue(),
+                _to_excel_bytes(query, results_df, searched_at.strftime('%Y-%m-%d %H:%M:%S')),
                 f"search_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                 "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
@@ -476,8 +583,8 @@ class SearchInterface:
         
         # Add top transactions
         top_transactions = results_df.nlargest(5, 'amount')[['date', 'description', 'amount']]
-        for _, row in top_transactions.iterrows():
-            report += f"- {row['date'][:10]}: {row['description']} - ${row['amount']:,.2f}\n"
+        for date, description, amount in top_transactions.itertuples(index=False, name=None):
+            report += f"- {date:%Y-%m-%d}: {description} - ${amount:,.2f}\n"
         
         st.markdown(report)
         
@@ -571,9 +678,13 @@ class AnalyticsDashboard:
         if not hasattr(self, 'filtered_df') or self.filtered_df.empty:
             return
         
-        # Calculate metrics
-        total_income = self.filtered_df[self.filtered_df['amount'] > 0]['amount'].sum()
-        total_expenses = abs(self.filtered_df[self.filtered_df['amount'] < 0]['amount'].sum())
+        # Calculate metrics on exact integer cents, so totals carry no float drift
+        if 'amount_cents' in self.filtered_df:
+            cents = self.filtered_df['amount_cents'].to_numpy()
+        else:
+            cents = np.rint(self.filtered_df['amount'].to_numpy() * 100).astype(np.int64)
+        total_income = cents[cents > 0].sum() / 100
+        total_expenses = -cents[cents < 0].sum() / 100
         net_amount = total_income - total_expenses
         avg_transaction = self.filtered_df['amount'].mean()
         
@@ -616,51 +727,11 @@ class AnalyticsDashboard:
         
         st.subheader("🏷️ Category Analysis")
         
-        # Categorize transactions (enhanced version)
-        def enhanced_categorize(desc):
-            desc_lower = desc.lower()
-            
-            # Groceries
-            if any(word in desc_lower for word in ['grocery', 'safeway', 'walmart', 'kroger', 'trader joe', 'whole foods']):
-                return 'Groceries'
-            
-            # Restaurants & Dining
-            elif any(word in desc_lower for word in ['restaurant', 'cafe', 'starbucks', 'mcdonald', 'pizza', 'burger', 'taco', 'subway', 'chipotle']):
-                return 'Dining'
-            
-            # Gas & Transportation
-            elif any(word in desc_lower for word in ['gas', 'fuel', 'chevron', 'shell', 'uber', 'lyft', 'taxi']):
-                return 'Transportation'
-            
-            # Shopping
-            elif any(word in desc_lower for word in ['amazon', 'target', 'shopping', 'store', 'mall', 'ebay']):
-                return 'Shopping'
-            
-            # ATM & Banking
-            elif any(word in desc_lower for word in ['atm', 'withdrawal', 'bank', 'fee']):
-                return 'Banking'
-            
-            # Subscriptions & Entertainment
-            elif any(word in desc_lower for word in ['netflix', 'spotify', 'subscription', 'hulu', 'disney']):
-                return 'Entertainment'
-            
-            # Healthcare
-            elif any(word in desc_lower for word in ['pharmacy', 'doctor', 'medical', 'hospital', 'cvs', 'walgreens']):
-                return 'Healthcare'
-            
-            # Utilities
-            elif any(word in desc_lower for word in ['electric', 'utility', 'phone', 'internet', 'cable']):
-                return 'Utilities'
-            
-            # Income
-            elif any(word in desc_lower for word in ['salary', 'payroll', 'deposit', 'income', 'refund']):
-                return 'Income'
-            
-            else:
-                return 'Other'
-        
-        # Apply categorization
-        self.filtered_df['category'] = self.filtered_df['description'].apply(enhanced_categorize)
+        # Categorize transactions (enhanced version); first matching category
+        # in priority order wins. Plain labels keep groupby to observed ones
+        self.filtered_df = self.filtered_df.assign(
+            category=categorize_descriptions(self.filtered_df['description'], _CATEGORY_RULES).to_numpy()
+        )
         
         # Category summary
         category_summary = self.filtered_df.groupby('category').agg({
@@ -1,8 +1,15 @@
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from datetime import datetime, timedelta
 import pandas as pd
+import numpy as np
+import re
+from components.common import categorize_descriptions, frame_hash
+
+# Upper bound on points drawn by time-series charts
+MAX_CHART_POINTS = 2000
 
 def setup_page_config():
     """Page config is handled in main app - this is just a placeholder"""
@@ -115,16 +122,65 @@ def create_spending_chart(transactions_df):
     if transactions_df.empty:
         return None
     
+    # The figure is built and serialized once per distinct input, then reused
+    return pio.from_json(_spending_chart_json(transactions_df[['date', 'amount']]))
+
+def create_category_chart(transactions_df):
+    """Create category breakdown pie chart"""
+    if transactions_df.empty:
+        return None
+    
+    return pio.from_json(_category_chart_json(transactions_df[['description', 'amount']]))
+
+def _lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that keep the line's shape"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Third triangle vertex: mean of the next bucket (the last point for the final one)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # Keep the point spanning the largest triangle with the previously kept one
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    
+    return indices
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_hash})
+def _spending_chart_json(transactions_df):
+    """Build the daily spending line chart as Plotly JSON"""
     # Group by date and sum amounts
     daily_spending = transactions_df.groupby('date')['amount'].sum().reset_index()
     daily_spending = daily_spending.sort_values('date')
     
+    # Long histories are downsampled; drawing cost grows with point count
+    if len(daily_spending) > MAX_CHART_POINTS:
+        keep = _lttb_indices(
+            daily_spending['date'].to_numpy().astype(np.int64).astype(np.float64),
+            daily_spending['amount'].to_numpy(dtype=np.float64),
+            MAX_CHART_POINTS
+        )
+        daily_spending = daily_spending.iloc[keep]
+    
     fig = px.line(
         daily_spending,
         x='date',
         y='amount',
         title='Daily Spending Trend',
-        labels={'amount': 'Amount ($)', 'date': 'Date'}
+        labels={'amount': 'Amount ($)', 'date': 'Date'},
+        render_mode='webgl'  # scattergl: drawn on the GPU, not as SVG paths
     )
     
     fig.update_layout(
@@ -133,38 +189,21 @@ def create_spending_chart(transactions_df):
         template='plotly_white'
     )
     
-    return fig
+    return fig.to_json()
 
-def create_category_chart(transactions_df):
-    """Create category breakdown pie chart"""
-    if transactions_df.empty:
-        return None
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_hash})
+def _category_chart_json(transactions_df):
+    """Build the expense category pie chart as Plotly JSON"""
+    # Simple category detection based on description (cached across reruns)
+    categories = categorize_descriptions(transactions_df['description'])
+    
+    # Only show expenses (negative amounts); slice the arrays, not the frame
+    amounts = transactions_df['amount'].to_numpy()
+    mask = amounts < 0
+    expenses = pd.DataFrame({'category': categories.array[mask], 'amount': -amounts[mask]})
     
-    # Simple category detection based on description
-    def categorize_transaction(desc):
-        desc_lower = desc.lower()
-        if any(word in desc_lower for word in ['grocery', 'safeway', 'walmart', 'kroger']):
-            return 'Groceries'
-        elif any(word in desc_lower for word in ['restaurant', 'cafe', 'starbucks', 'mcdonald', 'pizza']):
-            return 'Dining'
-        elif any(word in desc_lower for word in ['gas', 'fuel', 'chevron', 'shell']):
-            return 'Gas'
-        elif any(word in desc_lower for word in ['amazon', 'target', 'shopping']):
-            return 'Shopping'
-        elif any(word in desc_lower for word in ['atm', 'withdrawal']):
-            return 'Cash'
-        elif any(word in desc_lower for word in ['netflix', 'spotify', 'subscription']):
-            return 'Subscriptions'
-        else:
-            return 'Other'
-    
-    transactions_df['category'] = transactions_df['description'].apply(categorize_transaction)
-    
-    # Only show expenses (negative amounts)
-    expenses = transactions_df[transactions_df['amount'] < 0].copy()
-    expenses['amount'] = expenses['amount'].abs()
-    
-    category_spending = expenses.groupby('category')['amount'].sum().reset_index()
+    # Slice order is cosmetic in a pie chart, so skip sorting the groups
+    category_spending = expenses.groupby('category', sort=False, observed=True)['amount'].sum().reset_index()
     
     fig = px.pie(
         category_spending,
@@ -175,4 +214,4 @@ def create_category_chart(transactions_df):
     
     fig.update_layout(height=400)
     
-    return fig
\ No newline at end of file
+    return fig.to_json()
\ No newline at end of file
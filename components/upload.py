@@ -5,11 +5,174 @@ from pathlib import Path
 import io
 from datetime import datetime
 import re
+import functools
+import hashlib
+import os
+from components.common import frame_hash
+
+# Weekday names in Monday=0 order, matching Series.dt.weekday codes
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+@functools.lru_cache(maxsize=None)
+def _keyword_regex(keywords):
+    """Compiled alternation matching any of the given literal keywords"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+def read_csv_bytes(data, **kwargs):
+    """Read CSV bytes with the multithreaded pyarrow engine, falling back to C"""
+    try:
+        return pd.read_csv(io.BytesIO(data), engine='pyarrow', **kwargs)
+    except Exception:
+        # pyarrow missing, or input it can't handle (ragged rows, bad bytes);
+        # the C engine either copes or raises the familiar pandas error
+        return pd.read_csv(io.BytesIO(data), low_memory=False, **kwargs)
+
+def _sniff_encoding(data, sample_size=65536):
+    """Best-guess text encoding of the file's first bytes"""
+    from charset_normalizer import from_bytes  # Only needed once a CSV arrives
+    
+    match = from_bytes(data[:sample_size]).best()
+    if match is None or match.encoding == 'ascii':
+        return 'utf-8'
+    return match.encoding
+
+def read_excel_bytes(data):
+    """Read Excel bytes with the Rust calamine engine, falling back to the default"""
+    try:
+        return pd.read_excel(io.BytesIO(data), engine='calamine')
+    except (ImportError, ValueError):
+        # pandas < 2.2 doesn't know the engine, or python-calamine isn't installed
+        return pd.read_excel(io.BytesIO(data))
+
+def _parse_amounts(values):
+    """Parse an amount column, stripping currency formatting only when needed"""
+    # Columns the reader already typed as numbers need no string cleanup
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    
+    # Arrow-backed strings run the regex over contiguous buffers, not objects
+    try:
+        cleaned = values.astype('string[pyarrow]').str.replace(r'[$,()]', '', regex=True)
+    except ImportError:
+        cleaned = values.astype(str).str.replace(r'[$,()]', '', regex=True)
+    
+    cleaned = cleaned.to_numpy(dtype=object, na_value=np.nan)
+    return pd.Series(pd.to_numeric(cleaned, errors='coerce'), index=values.index, dtype=float)
+
+# Rows per chunk when large delimited uploads are read incrementally
+CSV_CHUNK_ROWS = 50_000
+
+# Bumped whenever parsing output changes, so stale Parquet copies are ignored
+_PARSED_CACHE_VERSION = 1
+
+def _evict_parsed_cache(cache_dir, max_bytes):
+    """Delete the least recently used Parquet copies in cache_dir until it fits max_bytes"""
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith('.parquet'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        Path(path).unlink(missing_ok=True)
+        total -= size
+
+def cached_parse(tag, data, parse):
+    """Return parse(data), reusing a Parquet copy saved by an earlier session"""
+    # Settings are imported here, not at module level: importing them creates
+    # the project's data directories, which merely loading this module
+    # (e.g. from simple_app) shouldn't do
+    from config.settings import PARSED_CACHE_DIR, PARSED_CACHE_ENABLED, PARSED_CACHE_MAX_MB
+    
+    if not PARSED_CACHE_ENABLED:
+        return parse(data)
+    
+    key = hashlib.blake2b(data, digest_size=16)
+    key.update(f"{tag}:v{_PARSED_CACHE_VERSION}".encode())
+    path = PARSED_CACHE_DIR / f"{key.hexdigest()}.parquet"
+    
+    if path.exists():
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)  # mtime doubles as the LRU timestamp
+            return df
+        except Exception:
+            pass  # Unreadable copy (e.g. an interrupted write); parse afresh
+    
+    df = parse(data)
+    try:
+        df.to_parquet(path, compression='zstd', index=False)
+    except Exception:
+        # Frames Arrow can't type (mixed object columns) simply aren't persisted
+        path.unlink(missing_ok=True)
+    else:
+        _evict_parsed_cache(PARSED_CACHE_DIR, PARSED_CACHE_MAX_MB * 1024 * 1024)
+    return df
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _parse_bytes(name, data):
+    """Parse raw file bytes based on the file extension"""
+    file_extension = Path(name).suffix.lower()
+    
+    if file_extension == '.csv':
+        # Sniff the encoding once instead of re-parsing per guessed encoding
+        try:
+            return read_csv_bytes(data, encoding=_sniff_encoding(data))
+        except UnicodeDecodeError:
+            # The sampled head decoded cleanly but a later byte doesn't;
+            # latin-1 maps every byte, so this parse always succeeds
+            return read_csv_bytes(data, encoding='latin-1')
+        
+    elif file_extension in ['.xlsx', '.xls']:
+        return read_excel_bytes(data)
+        
+    elif file_extension == '.txt':
+        # Assume tab-separated or comma-separated
+        return read_csv_bytes(data, sep='\t' if b'\t' in data else ',', encoding='utf-8')
+    
+    raise Exception(f"Unsupported file format: {file_extension}")
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs={pd.DataFrame: frame_hash})
+def _clean_transactions(df):
+    """Clean and standardize the combined DataFrame"""
+    # Remove duplicates, comparing one 64-bit row fingerprint per transaction
+    # instead of hashing and combining the three columns separately
+    fingerprint = pd.util.hash_pandas_object(df[['date', 'description', 'amount']], index=False)
+    df = df[~fingerprint.duplicated().to_numpy()]
+    
+    # Sort by date (renumbering the index in the same pass)
+    df = df.sort_values('date', kind='stable', ignore_index=True)
+    
+    # Amounts are quantized to whole cents once; integer cents sum exactly
+    cents = np.rint(df['amount'].to_numpy(dtype=float) * 100).astype(np.int64)
+    
+    # Clean descriptions and add useful derived fields in a single assign,
+    # reusing one datetime accessor instead of a pass per inserted column
+    dates = df['date'].dt
+    year = dates.year.to_numpy()
+    weekday = dates.weekday.to_numpy()
+    return df.assign(
+        description=df['description'].str.strip().str.upper(),
+        amount=cents / 100.0,
+        amount_cents=cents,
+        month=(year * 100 + dates.month.to_numpy()).astype(np.int32),  # YYYYMM
+        year=year.astype(np.int16),
+        day_of_week=pd.Categorical.from_codes(weekday, categories=WEEKDAY_NAMES),
+        is_weekend=weekday >= 5,
+        transaction_type=pd.Categorical.from_codes(
+            (cents <= 0).view(np.int8), categories=['Credit', 'Debit']
+        )
+    )
 
 class FileUploader:
     def __init__(self):
         self.supported_formats = ['.csv', '.xlsx', '.xls', '.txt']
         self.max_file_size = 50 * 1024 * 1024  # 50MB in bytes
+        self.chunked_read_threshold = 5 * 1024 * 1024  # Delimited files above this are read in chunks
     
     def render_upload_interface(self):
         """Render the file upload interface"""
@@ -81,41 +244,41 @@ class FileUploader:
     
     def _parse_file(self, uploaded_file):
         """Parse individual file based on its format"""
-        file_extension = Path(uploaded_file.name).suffix.lower()
-        
         try:
-            if file_extension == '.csv':
-                # Try different encodings
-                for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                    try:
-                        df = pd.read_csv(uploaded_file, encoding=encoding)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                else:
-                    raise Exception("Could not decode CSV file")
-                    
-            elif file_extension in ['.xlsx', '.xls']:
-                df = pd.read_excel(uploaded_file)
-                
-            elif file_extension == '.txt':
-                # Assume tab-separated or comma-separated
-                content = uploaded_file.read().decode('utf-8')
-                if '\t' in content:
-                    df = pd.read_csv(io.StringIO(content), sep='\t')
-                else:
-                    df = pd.read_csv(io.StringIO(content))
-            else:
-                raise Exception(f"Unsupported file format: {file_extension}")
-            
-            # Reset file pointer for potential re-reading
-            uploaded_file.seek(0)
-            
-            return self._standardize_columns(df, uploaded_file.name)
+            # Parsing is cached on the file's name and bytes, so reruns skip it;
+            # the standardized result is also kept on disk for later sessions
+            name = uploaded_file.name
+            df = cached_parse(
+                f"standardized{Path(name).suffix.lower()}",
+                uploaded_file.getvalue(),
+                lambda data: self._parse_and_standardize(name, data)
+            )
+            return df.assign(source_file=name)
             
         except Exception as e:
             raise Exception(f"Failed to parse file: {str(e)}")
     
+    def _parse_and_standardize(self, name, data):
+        """Parse file bytes into standardized transactions"""
+        file_extension = Path(name).suffix.lower()
+        if len(data) <= self.chunked_read_threshold or file_extension not in ['.csv', '.txt']:
+            return self._standardize_columns(_parse_bytes(name, data), name)
+        
+        # Large delimited files are standardized chunk by chunk, so only the
+        # compact standardized columns are ever held for the whole file
+        if file_extension == '.txt':
+            return self._standardize_chunks(data, name, sep='\t' if b'\t' in data else ',', encoding='utf-8')
+        try:
+            return self._standardize_chunks(data, name, encoding=_sniff_encoding(data))
+        except UnicodeDecodeError:
+            return self._standardize_chunks(data, name, encoding='latin-1')
+    
+    def _standardize_chunks(self, data, filename, **read_options):
+        """Read a delimited file in fixed-size chunks and standardize each one"""
+        with pd.read_csv(io.BytesIO(data), chunksize=CSV_CHUNK_ROWS, **read_options) as reader:
+            chunks = [self._standardize_columns(chunk, filename) for chunk in reader]
+        return pd.concat(chunks, ignore_index=True)
+    
     def _standardize_columns(self, df, filename):
         """Standardize column names and extract required fields"""
         # Convert column names to lowercase for easier matching
@@ -144,7 +307,7 @@ class FileUploader:
         standardized_df = pd.DataFrame({
             'date': pd.to_datetime(df[date_col], errors='coerce', dayfirst=True),
             'description': df[desc_col].astype(str),
-            'amount': pd.to_numeric(df[amount_col].astype(str).str.replace(r'[$,()]', '', regex=True), errors='coerce'),
+            'amount': _parse_amounts(df[amount_col]),
             'source_file': filename
         })
         
@@ -162,33 +325,19 @@ class FileUploader:
     
     def _find_column(self, columns, patterns):
         """Find column name that matches any of the patterns"""
+        # One precompiled regex pass narrows the columns down to candidates;
+        # pattern priority is then resolved among those few
+        matcher = _keyword_regex(tuple(patterns))
+        candidates = [col for col in columns if matcher.search(col)]
         for pattern in patterns:
-            for col in columns:
+            for col in candidates:
                 if pattern in col:
                     return col
         return None
     
     def _clean_and_standardize(self, df):
         """Clean and standardize the combined DataFrame"""
-        # Remove duplicates
-        df = df.drop_duplicates(subset=['date', 'description', 'amount'])
-        
-        # Sort by date
-        df = df.sort_values('date').reset_index(drop=True)
-        
-        # Clean descriptions
-        df['description'] = df['description'].str.strip().str.upper()
-        
-        # Add useful derived fields
-        df['month'] = df['date'].dt.to_period('M')
-        df['year'] = df['date'].dt.year
-        df['day_of_week'] = df['date'].dt.day_name()
-        df['is_weekend'] = df['date'].dt.weekday >= 5
-        
-        # Add transaction type
-        df['transaction_type'] = df['amount'].apply(lambda x: 'Credit' if x > 0 else 'Debit')
-        
-        return df
+        return _clean_transactions(df)
     
     def _show_format_examples(self):
         """Show examples of supported file formats"""
@@ -232,7 +381,7 @@ def show_data_summary(df):
             st.metric("Total Transactions", len(df))
         
         with col2:
-            net_amount = df['amount'].sum()
+            net_amount = df['amount_cents'].sum() / 100 if 'amount_cents' in df else df['amount'].sum()
             st.metric("Net Amount", f"${net_amount:,.2f}")
         
         with col3:
@@ -9,20 +9,34 @@ from pathlib import Path
 import chromadb
 from datetime import datetime
 
-def get_directory_size(path):
-    """Calculate total size of directory in bytes"""
-    total = 0
+def _iter_files(path, prefix=""):
+    """Yield (relative path, size) for every file under path, via os.scandir"""
     try:
-        for dirpath, dirnames, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
+        with os.scandir(path) as entries:
+            for entry in entries:
                 try:
-                    total += os.path.getsize(filepath)
+                    if entry.is_file(follow_symlinks=False):
+                        yield os.path.join(prefix, entry.name), entry.stat(follow_symlinks=False).st_size
+                    elif entry.is_dir(follow_symlinks=False):
+                        yield from _iter_files(entry.path, os.path.join(prefix, entry.name))
                 except (OSError, FileNotFoundError):
                     pass
     except (OSError, FileNotFoundError):
         pass
-    return total
+
+def get_directory_size(path):
+    """Calculate total size of directory in bytes"""
+    return sum(size for _, size in _iter_files(path))
+
+# One client per database path for the life of the process
+_CLIENTS = {}
+
+def _get_client(path):
+    """Return a memoized ChromaDB client for the given database directory"""
+    key = str(path)
+    if key not in _CLIENTS:
+        _CLIENTS[key] = chromadb.PersistentClient(path=key)
+    return _CLIENTS[key]
 
 def format_bytes(bytes_size):
     """Convert bytes to human readable format"""
@@ -50,26 +64,23 @@ def analyze_chromadb():
         print("💡 Upload some bank statements first to create the database.")
         return
     
+    # One directory walk feeds both the total size and the file listing
+    files = list(_iter_files(DATABASE_DIR))
+    
     # Calculate total size
-    total_size = get_directory_size(DATABASE_DIR)
+    total_size = sum(size for _, size in files)
     print(f"💾 Total Database Size: {format_bytes(total_size)}")
     print()
     
     # List all files in database directory
     print("📂 Database Files:")
-    try:
-        for item in DATABASE_DIR.rglob("*"):
-            if item.is_file():
-                size = item.stat().st_size
-                relative_path = item.relative_to(DATABASE_DIR)
-                print(f"   📄 {relative_path}: {format_bytes(size)}")
-    except Exception as e:
-        print(f"   ❌ Error listing files: {e}")
+    for relative_path, size in files:
+        print(f"   📄 {relative_path}: {format_bytes(size)}")
     print()
     
     # Connect to ChromaDB and get collection info
     try:
-        client = chromadb.PersistentClient(path=str(DATABASE_DIR))
+        client = _get_client(DATABASE_DIR)
         collections = client.list_collections()
         
         print("🗂️  ChromaDB Collections:")
@@ -100,19 +111,22 @@ def analyze_chromadb():
     if sqlite_path.exists():
         print("🗄️  SQLite Database Info:")
         try:
-            conn = sqlite3.connect(sqlite_path)
+            # Read-only: this scan never writes, and must not contend with the app
+            conn = sqlite3.connect(f"{sqlite_path.as_uri()}?mode=ro", uri=True)
             cursor = conn.cursor()
             
             # Get table names
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
+            tables = [row[0] for row in cursor.fetchall()]
             
             print(f"   📋 Tables: {len(tables)}")
-            for table in tables:
-                table_name = table[0]
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-                count = cursor.fetchone()[0]
-                print(f"      • {table_name}: {count:,} rows")
+            if tables:
+                # Count every table in one statement instead of one query per table
+                query = " UNION ALL ".join(
+                    "SELECT ?, COUNT(*) FROM \"{}\"".format(name.replace('"', '""')) for name in tables
+                )
+                for table_name, count in cursor.execute(query, tables).fetchall():
+                    print(f"      • {table_name}: {count:,} rows")
             
             conn.close()
             
@@ -131,7 +145,7 @@ def monitor_growth():
         
         # Log to file
         log_file = Path(__file__).parent / "database_growth.log"
-        with open(log_file, "a") as f:
+        with open(log_file, "a", buffering=1) as f:
             f.write(f"{timestamp},{size},{format_bytes(size)}\n")
         
         print(f"📊 {timestamp}: Database size is {format_bytes(size)}")
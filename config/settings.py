@@ -7,14 +7,25 @@ DATA_DIR = PROJECT_ROOT / "data"
 DATABASE_DIR = PROJECT_ROOT / "database"
 EXPORTS_DIR = PROJECT_ROOT / "exports"
 LOGS_DIR = PROJECT_ROOT / "logs"
+PARSED_CACHE_DIR = DATA_DIR / "parsed"  # Parquet copies of parsed uploads
+
+# The parsed-upload cache stores plaintext copies of bank statements on disk,
+# so it is off unless PARSED_CACHE_ENABLED is set; the oldest copies are
+# evicted once the directory grows past PARSED_CACHE_MAX_MB
+PARSED_CACHE_ENABLED = os.getenv("PARSED_CACHE_ENABLED", "").lower() in ("1", "true", "yes")
+PARSED_CACHE_MAX_MB = int(os.getenv("PARSED_CACHE_MAX_MB", "200"))
 
 # Ensure directories exist
 for directory in [DATA_DIR, DATABASE_DIR, EXPORTS_DIR, LOGS_DIR]:
     directory.mkdir(exist_ok=True)
+if PARSED_CACHE_ENABLED:
+    PARSED_CACHE_DIR.mkdir(exist_ok=True)
 
 # ChromaDB settings
 CHROMA_COLLECTION_NAME = "bank_transactions"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# "sentence-transformers" (PyTorch) or "onnx" (same MiniLM model, run by onnxruntime on CPU)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
 
 # Application settings
 MAX_FILE_SIZE_MB = 50
@@ -25,9 +25,9 @@ except Exception as e:
     st.error(f"❌ Upload error: {e}")
 
 try:
-    from components.search import BankStatementRAG
+    from components.search import get_rag_system
     st.success("✅ Search imports work")
-    rag = BankStatementRAG()
+    rag = get_rag_system()
     st.success("✅ BankStatementRAG created")
 except Exception as e:
     st.error(f"❌ Search error: {e}")
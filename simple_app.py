@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sys
 from pathlib import Path
 import re
+import io
+from collections import Counter
 
 # MUST BE FIRST: Set page config
 st.set_page_config(
@@ -15,6 +18,43 @@ st.set_page_config(
 PROJECT_ROOT = Path(__file__).parent
 sys.path.append(str(PROJECT_ROOT))
 
+from components.analytics import compute_key_metrics
+from components.common import frame_hash, frame_key
+from components.upload import read_csv_bytes, read_excel_bytes, CSV_CHUNK_ROWS
+
+# Column name keywords per field, highest priority first
+COLUMN_PATTERNS = {
+    'date': ['date', 'transaction date', 'posted date', 'trans date', 'posting date', 'effective date'],
+    'description': ['description', 'desc', 'memo', 'transaction', 'details', 'payee', 'merchant', 'reference', 'transaction details'],
+    'amount': ['amount', 'transaction amount', 'value', 'sum', 'total'],
+    'debit': ['debit', 'withdrawal', 'outgoing', 'expense'],
+    'credit': ['credit', 'deposit', 'incoming', 'income']
+}
+_COLUMN_REGEXES = {
+    field: re.compile('|'.join(map(re.escape, patterns)))
+    for field, patterns in COLUMN_PATTERNS.items()
+}
+
+# Currency formatting characters stripped from amount columns (a plain
+# character table, no regex engine involved)
+_CURRENCY_STRIP = str.maketrans('', '', '$,()')
+
+# CSV uploads above this size are read and processed chunk by chunk
+CHUNKED_READ_BYTES = 5 * 1024 * 1024
+
+# Bytes per block when large CSVs are streamed through pyarrow
+CSV_BLOCK_BYTES = 1 << 20
+
+# Amounts are stored as float32 when every magnitude is below this
+FLOAT32_AMOUNT_LIMIT = 1e5
+
+# Rows shipped to the browser for the "All" view unless the user opts in
+MAX_DISPLAY_ROWS = 1000
+
+# Pages run as fragments where Streamlit supports them, so their own widgets
+# rerun only that page; older releases just run them as plain functions
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
 def main():
     st.title("🏦 Bank Statement RAG System")
     st.markdown("Upload your bank statements and search through your transactions")
@@ -57,60 +97,149 @@ def main():
 
 def detect_columns(df):
     """Smart column detection for bank statement formats"""
-    columns = df.columns.str.lower().str.strip()
-    
-    # Date column patterns
-    date_patterns = ['date', 'transaction date', 'posted date', 'trans date', 'posting date', 'effective date']
-    date_col = None
-    for pattern in date_patterns:
-        matches = [col for col in df.columns if pattern in col.lower()]
-        if matches:
-            date_col = matches[0]
-            break
-    
-    # Description column patterns  
-    desc_patterns = ['description', 'desc', 'memo', 'transaction', 'details', 'payee', 'merchant', 'reference', 'transaction details']
-    desc_col = None
-    for pattern in desc_patterns:
-        matches = [col for col in df.columns if pattern in col.lower()]
-        if matches:
-            desc_col = matches[0]
-            break
-    
-    # Amount column patterns
-    amount_patterns = ['amount', 'transaction amount', 'value', 'sum', 'total']
-    amount_col = None
-    for pattern in amount_patterns:
-        matches = [col for col in df.columns if pattern in col.lower()]
-        if matches:
-            amount_col = matches[0]
-            break
-    
-    # Check for separate debit/credit columns
-    debit_col = None
-    credit_col = None
-    debit_patterns = ['debit', 'withdrawal', 'outgoing', 'expense']
-    credit_patterns = ['credit', 'deposit', 'incoming', 'income']
-    
-    for pattern in debit_patterns:
-        matches = [col for col in df.columns if pattern in col.lower()]
-        if matches:
-            debit_col = matches[0]
-            break
-    
-    for pattern in credit_patterns:
-        matches = [col for col in df.columns if pattern in col.lower()]
-        if matches:
-            credit_col = matches[0]
-            break
-    
-    return {
-        'date': date_col,
-        'description': desc_col,
-        'amount': amount_col,
-        'debit': debit_col,
-        'credit': credit_col
-    }
+    # Lowercase each column name once; a precompiled alternation per field
+    # narrows the columns to candidates, then keyword priority decides
+    lowered = [(col, str(col).lower()) for col in df.columns]
+    
+    mapping = {}
+    for field, patterns in COLUMN_PATTERNS.items():
+        candidates = [(col, low) for col, low in lowered if _COLUMN_REGEXES[field].search(low)]
+        mapping[field] = next(
+            (col for pattern in patterns for col, low in candidates if pattern in low), None
+        )
+    
+    return mapping
+
+def _as_datetime(values):
+    """Convert a column to datetime64, skipping parsing the dtype makes unnecessary"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    if values.dtype.kind == 'i':
+        # Integers are epoch nanoseconds, exactly as to_datetime reads them
+        return values.astype('datetime64[ns]')
+    return pd.to_datetime(values, errors='coerce')
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def read_uploaded_file(name, data):
+    """Read an uploaded CSV or Excel file from its raw bytes"""
+    reader = read_csv_bytes if name.lower().endswith('.csv') else read_excel_bytes
+    return reader(data)
+
+def _is_large_csv(name, data):
+    return name.lower().endswith('.csv') and len(data) > CHUNKED_READ_BYTES
+
+def _arrow_csv_chunks(data):
+    """Yield a CSV as DataFrames of text columns, one Arrow block at a time"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    
+    read_options = pa_csv.ReadOptions(block_size=CSV_BLOCK_BYTES)
+    # Every column is read as text: types inferred from the first block can
+    # disagree with later ones, and process_dataframe parses what it needs
+    names = pa_csv.open_csv(io.BytesIO(data), read_options=read_options).schema.names
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in names}, strings_can_be_null=True
+    )
+    for batch in pa_csv.open_csv(io.BytesIO(data), read_options=read_options, convert_options=convert_options):
+        yield batch.to_pandas()
+
+def _pandas_csv_chunks(data):
+    """Yield a CSV as DataFrames of CSV_CHUNK_ROWS rows using the C engine"""
+    with pd.read_csv(io.BytesIO(data), chunksize=CSV_CHUNK_ROWS, low_memory=False) as reader:
+        yield from reader
+
+def read_in_chunks(name, data):
+    """Yield an uploaded file as DataFrames; large CSVs come in blocks"""
+    if not _is_large_csv(name, data):
+        # Excel isn't chunkable, and small files aren't worth it
+        yield read_uploaded_file(name, data)
+        return
+    
+    # pyarrow's streaming reader parses each block on several threads
+    try:
+        chunks = _arrow_csv_chunks(data)
+        first = next(chunks)
+    except Exception:
+        # pyarrow missing, or a file it can't parse; the C engine either
+        # copes or raises the familiar pandas error
+        yield from _pandas_csv_chunks(data)
+        return
+    yield first
+    yield from chunks
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def process_uploaded_file(name, data, mapping_items):
+    """Read and process an uploaded file; cached on its bytes and column mapping"""
+    column_mapping = dict(mapping_items)
+    if not _is_large_csv(name, data):
+        return _downcast_amounts(process_dataframe(read_uploaded_file(name, data), column_mapping))
+    
+    # Each chunk is standardized as it's read, so the raw text columns of
+    # the whole file are never held at once
+    try:
+        parts = [process_dataframe(chunk, column_mapping) for chunk in read_in_chunks(name, data)]
+    except Exception:
+        # pyarrow can reject a block past the first (e.g. a ragged row) after
+        # earlier blocks were already processed; start over with the C engine,
+        # which pads short rows, or raises the familiar pandas error
+        parts = [process_dataframe(chunk, column_mapping) for chunk in _pandas_csv_chunks(data)]
+    processed_df = pd.concat(parts, ignore_index=True)
+    if 'date' in processed_df.columns:
+        processed_df = processed_df.sort_values('date', kind='stable', ignore_index=True)
+    return _downcast_amounts(processed_df)
+
+def _downcast_amounts(df):
+    """Store amounts as float32 when every magnitude allows it"""
+    # Decided once for the whole file: per-chunk choices would mix float32
+    # and float64 chunks, and concat would carry float32 rounding noise into
+    # float64 amounts. float32 keeps every cent distinct below $100k and
+    # halves the bytes each scan reads; larger statements stay float64
+    if 'amount' in df.columns and df['amount'].abs().max() < FLOAT32_AMOUNT_LIMIT:
+        df['amount'] = df['amount'].astype(np.float32)
+    return df
+
+# Columns shown wherever transactions are listed
+DISPLAY_COLUMNS = ['date', 'description', 'amount', 'transaction_type']
+
+def _render_transactions(df, **dataframe_kwargs):
+    """Show the standard transaction columns; returns False if none are present"""
+    available_cols = [col for col in DISPLAY_COLUMNS if col in df.columns]
+    if not available_cols:
+        return False
+    
+    # Only dates become strings; amounts stay numeric and are formatted in the browser
+    display_df = df[available_cols]
+    if 'date' in display_df.columns:
+        display_df = display_df.assign(date=_as_datetime(display_df['date']).dt.strftime('%Y-%m-%d'))
+    
+    st.dataframe(
+        display_df,
+        column_config={'amount': st.column_config.NumberColumn(format='$%.2f')},
+        use_container_width=True,
+        **dataframe_kwargs
+    )
+    return True
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.Series: frame_hash})
+def _top_tokens(descriptions, n=10):
+    """Most common description words longer than three characters"""
+    # One pass over the raw strings; no exploded Series of every token
+    counts = Counter(
+        tok for desc in descriptions.to_numpy(dtype=object) if isinstance(desc, str)
+        for tok in desc.upper().split() if len(tok) > 3
+    )
+    return [tok for tok, _ in counts.most_common(n)]
+
+@st.cache_data(show_spinner=False, hash_funcs={pd.DataFrame: frame_key})
+def _transaction_breakdown(df, n_merchants=5):
+    """Transaction counts per type and the most frequent expense descriptions"""
+    type_counts = df['transaction_type'].value_counts()
+    type_counts = type_counts[type_counts > 0]  # Categoricals list unused types too
+    top_merchants = {}
+    if 'description' in df.columns:
+        # (no emptiness guard: counting an empty selection yields nothing)
+        top_merchants = df['description'][df['amount'].to_numpy() < 0].value_counts().head(n_merchants)
+    return dict(type_counts), dict(top_merchants)
 
 def process_dataframe(df, column_mapping):
     """Process and standardize the dataframe"""
@@ -118,41 +247,54 @@ def process_dataframe(df, column_mapping):
     
     # Handle date column
     if column_mapping['date']:
-        processed_df['date'] = pd.to_datetime(processed_df[column_mapping['date']], errors='coerce')
+        dates = _as_datetime(processed_df[column_mapping['date']])
+        if isinstance(dates.dtype, np.dtype):
+            # Second resolution is plenty for statement dates (tz-aware columns are left as-is)
+            dates = dates.astype('datetime64[s]')
+        processed_df['date'] = dates
     
     # Handle description column
     if column_mapping['description']:
-        processed_df['description'] = processed_df[column_mapping['description']].astype(str).str.strip()
+        # Arrow-backed strings: string methods run as Arrow compute kernels
+        processed_df['description'] = processed_df[column_mapping['description']].astype('string[pyarrow]').str.strip()
+        # Lowercased once here so searches don't re-lowercase every row
+        processed_df['_desc_lower'] = processed_df['description'].str.lower()
     
     # Handle amount columns
     if column_mapping['amount']:
         # Single amount column
         processed_df['amount'] = pd.to_numeric(
-            processed_df[column_mapping['amount']].astype(str).str.replace(r'[$,()]', '', regex=True), 
+            processed_df[column_mapping['amount']].astype(str).str.translate(_CURRENCY_STRIP), 
             errors='coerce'
         )
     elif column_mapping['debit'] and column_mapping['credit']:
         # Separate debit/credit columns
         debit = pd.to_numeric(
-            processed_df[column_mapping['debit']].astype(str).str.replace(r'[$,()]', '', regex=True).fillna('0'), 
+            processed_df[column_mapping['debit']].astype(str).str.translate(_CURRENCY_STRIP), 
             errors='coerce'
         ).fillna(0)
         credit = pd.to_numeric(
-            processed_df[column_mapping['credit']].astype(str).str.replace(r'[$,()]', '', regex=True).fillna('0'), 
+            processed_df[column_mapping['credit']].astype(str).str.translate(_CURRENCY_STRIP), 
             errors='coerce'
         ).fillna(0)
         processed_df['amount'] = credit - debit  # Credits positive, debits negative
     
-    # Add transaction type
+    # Add transaction type (codes index the categories: Income, Expense, Zero)
     if 'amount' in processed_df.columns:
-        processed_df['transaction_type'] = processed_df['amount'].apply(
-            lambda x: 'Income' if x > 0 else 'Expense' if x < 0 else 'Zero'
+        amt = processed_df['amount'].to_numpy()
+        codes = np.select([amt > 0, amt < 0], [0, 1], default=2).astype(np.int8)
+        processed_df['transaction_type'] = pd.Categorical.from_codes(
+            codes, categories=['Income', 'Expense', 'Zero']
         )
     
     # Remove rows with missing critical data
     if 'date' in processed_df.columns and 'amount' in processed_df.columns:
         processed_df = processed_df.dropna(subset=['date', 'amount'])
     
+    # Sort once here so pages can reverse the frame instead of re-sorting it
+    if 'date' in processed_df.columns:
+        processed_df = processed_df.sort_values('date', ignore_index=True)
+    
     return processed_df
 
 def render_upload_page():
@@ -162,13 +304,21 @@ def render_upload_page():
     
     if uploaded_file is not None:
         try:
-            # Read the file
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                df = pd.read_excel(uploaded_file)
+            # Reruns for the same upload reuse its preview and detected mapping;
+            # the uploader's file id changes whenever a new file is chosen
+            file_key = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+            if st.session_state.get('_last_file_key') != file_key:
+                # Large CSVs only need their first chunk to detect columns
+                preview = next(read_in_chunks(uploaded_file.name, uploaded_file.getvalue()))
+                st.session_state._upload_preview = preview
+                st.session_state._detected_mapping = detect_columns(preview)
+                st.session_state._last_file_key = file_key
+            df = st.session_state._upload_preview
             
-            st.success(f"✅ File uploaded! {len(df)} rows, {len(df.columns)} columns found.")
+            if _is_large_csv(uploaded_file.name, uploaded_file.getvalue()):
+                st.success(f"✅ File uploaded! {len(df.columns)} columns found (previewing the first {len(df):,} rows).")
+            else:
+                st.success(f"✅ File uploaded! {len(df)} rows, {len(df.columns)} columns found.")
             
             # Show original columns
             st.subheader("📋 Original File Columns")
@@ -177,8 +327,8 @@ def render_upload_page():
                 col_info.append(f"{i+1}. `{col}` ({df[col].dtype})")
             st.write("\n".join(col_info))
             
-            # Auto-detect columns
-            column_mapping = detect_columns(df)
+            # Auto-detected columns (copied, so manual overrides don't leak into them)
+            column_mapping = dict(st.session_state._detected_mapping)
             st.session_state.column_mapping = column_mapping
             
             st.subheader("🔍 Auto-Detected Column Mapping")
@@ -197,12 +347,15 @@ def render_upload_page():
             with col2:
                 st.write("**Manual Override (if needed):**")
                 # Allow manual column selection
-                date_col = st.selectbox("Date Column:", [""] + list(df.columns), 
-                                      index=list(df.columns).index(column_mapping['date'])+1 if column_mapping['date'] else 0)
-                desc_col = st.selectbox("Description Column:", [""] + list(df.columns),
-                                      index=list(df.columns).index(column_mapping['description'])+1 if column_mapping['description'] else 0)
-                amount_col = st.selectbox("Amount Column:", [""] + list(df.columns),
-                                        index=list(df.columns).index(column_mapping['amount'])+1 if column_mapping['amount'] else 0)
+                # One options list and one position lookup shared by all three boxes
+                options = [""] + list(df.columns)
+                option_index = {col: i for i, col in enumerate(options)}
+                date_col = st.selectbox("Date Column:", options,
+                                      index=option_index.get(column_mapping['date'] or "", 0))
+                desc_col = st.selectbox("Description Column:", options,
+                                      index=option_index.get(column_mapping['description'] or "", 0))
+                amount_col = st.selectbox("Amount Column:", options,
+                                        index=option_index.get(column_mapping['amount'] or "", 0))
                 
                 # Update mapping if manual selection made
                 if date_col: column_mapping['date'] = date_col
@@ -214,7 +367,9 @@ def render_upload_page():
                 
                 if st.button("🔄 Process Data", type="primary"):
                     with st.spinner("Processing data..."):
-                        processed_df = process_dataframe(df, column_mapping)
+                        processed_df = process_uploaded_file(
+                            uploaded_file.name, uploaded_file.getvalue(), tuple(column_mapping.items())
+                        )
                         st.session_state.transactions_df = processed_df
                         st.session_state.column_mapping = column_mapping
                         
@@ -222,21 +377,18 @@ def render_upload_page():
                         
                         # Show processed preview
                         st.subheader("📊 Processed Data Preview")
-                        display_cols = ['date', 'description', 'amount', 'transaction_type']
-                        available_cols = [col for col in display_cols if col in processed_df.columns]
-                        st.dataframe(processed_df[available_cols].head(10))
+                        _render_transactions(processed_df.head(10))
                         
                         # Show stats
                         if 'amount' in processed_df.columns:
+                            metrics = compute_key_metrics(processed_df['amount'].to_numpy())
                             col1, col2, col3 = st.columns(3)
                             with col1:
                                 st.metric("Total Transactions", len(processed_df))
                             with col2:
-                                total = processed_df['amount'].sum()
-                                st.metric("Net Amount", f"${total:,.2f}")
+                                st.metric("Net Amount", f"${metrics['net_amount']:,.2f}")
                             with col3:
-                                avg = processed_df['amount'].mean()
-                                st.metric("Average", f"${avg:,.2f}")
+                                st.metric("Average", f"${metrics['avg_transaction']:,.2f}")
                         
                         st.success("🔍 **Ready to Search!** Go to the Search & Query section.")
             else:
@@ -247,6 +399,7 @@ def render_upload_page():
             st.error(f"Error processing file: {e}")
             st.info("💡 Try a different file format or check that your file isn't corrupted.")
 
+@fragment
 def render_search_page():
     st.header("🔍 Search & Query Transactions")
     
@@ -258,32 +411,29 @@ def render_search_page():
     
     # Smart search
     st.subheader("🔍 Smart Text Search")
-    search_term = st.text_input("Search in transaction descriptions:", placeholder="e.g., Starbucks, Amazon, ATM, etc.")
+    # A form submits once instead of rerunning the search on every keystroke
+    with st.form("text_search"):
+        search_term = st.text_input("Search in transaction descriptions:", placeholder="e.g., Starbucks, Amazon, ATM, etc.")
+        st.form_submit_button("Search")
     
     if search_term and 'description' in df.columns:
-        # Case-insensitive search
-        mask = df['description'].str.contains(search_term, case=False, na=False)
+        # Case-insensitive literal match; users type words, not regexes
+        if '_desc_lower' in df.columns:
+            mask = df['_desc_lower'].str.contains(search_term.lower(), regex=False, na=False)
+        else:
+            mask = df['description'].str.contains(search_term, case=False, regex=False, na=False)
         results = df[mask]
         
         if not results.empty:
             st.success(f"✅ Found {len(results)} transactions matching '{search_term}'")
             
             # Show results
-            display_cols = ['date', 'description', 'amount', 'transaction_type']
-            available_cols = [col for col in display_cols if col in results.columns]
-            
-            # Format for display
-            display_df = results[available_cols].copy()
-            if 'date' in display_df.columns:
-                display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
-            if 'amount' in display_df.columns:
-                display_df['amount'] = display_df['amount'].apply(lambda x: f"${x:,.2f}")
-            
-            st.dataframe(display_df, use_container_width=True)
+            _render_transactions(results)
             
             # Summary of search results
             if 'amount' in results.columns:
-                total_amount = results['amount'].sum()
+                # Accumulate in float64; amounts may be stored as float32
+                total_amount = results['amount'].to_numpy().sum(dtype=np.float64)
                 st.info(f"💰 **Total amount for '{search_term}' transactions:** ${total_amount:,.2f}")
         else:
             st.warning(f"❌ No transactions found matching '{search_term}'")
@@ -295,17 +445,15 @@ def render_search_page():
     
     if 'description' in df.columns:
         # Extract common merchants from data
-        descriptions = df['description'].str.upper().str.split().explode()
-        common_terms = descriptions.value_counts().head(10).index.tolist()
+        common_terms = _top_tokens(df['description'])
         
         # Create buttons for common terms
         cols = st.columns(5)
-        for i, term in enumerate(common_terms[:10]):
-            if len(term) > 3:  # Only show meaningful terms
-                with cols[i % 5]:
-                    if st.button(term, key=f"search_{term}"):
-                        # Auto-fill search box
-                        st.rerun()
+        for i, term in enumerate(common_terms):
+            with cols[i % 5]:
+                if st.button(term, key=f"search_{term}"):
+                    # Auto-fill search box
+                    st.rerun()
     
     # Amount filter
     st.subheader("💰 Filter by Amount Range")
@@ -317,21 +465,18 @@ def render_search_page():
             max_amount = st.number_input("Maximum amount:", value=float(df['amount'].max()))
         
         if st.button("Apply Amount Filter"):
-            filtered = df[(df['amount'] >= min_amount) & (df['amount'] <= max_amount)]
+            # Compare the raw amount buffer and AND in place, with no
+            # intermediate boolean Series or third mask array
+            amounts = df['amount'].to_numpy()
+            in_range = amounts >= min_amount
+            in_range &= amounts <= max_amount
+            filtered = df[in_range]
             st.success(f"✅ Found {len(filtered)} transactions between ${min_amount:,.2f} and ${max_amount:,.2f}")
             
             if not filtered.empty:
-                display_cols = ['date', 'description', 'amount', 'transaction_type']
-                available_cols = [col for col in display_cols if col in filtered.columns]
-                
-                display_df = filtered[available_cols].copy()
-                if 'date' in display_df.columns:
-                    display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
-                if 'amount' in display_df.columns:
-                    display_df['amount'] = display_df['amount'].apply(lambda x: f"${x:,.2f}")
-                
-                st.dataframe(display_df, use_container_width=True)
+                _render_transactions(filtered)
 
+@fragment
 def render_analytics_page():
     st.header("📊 Analytics Dashboard")
     
@@ -341,36 +486,39 @@ def render_analytics_page():
     
     df = st.session_state.transactions_df
     
+    # Sign masks are computed once and reused by every income/expense split below
+    if 'amount' in df.columns:
+        amounts = df['amount'].to_numpy()
+        is_income, is_expense = amounts > 0, amounts < 0
+    
     # Key metrics
     if 'amount' in df.columns:
         st.subheader("📈 Financial Overview")
+        metrics = compute_key_metrics(amounts)
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            income = df[df['amount'] > 0]['amount'].sum() if (df['amount'] > 0).any() else 0
-            st.metric("💰 Total Income", f"${income:,.2f}")
+            st.metric("💰 Total Income", f"${metrics['total_income']:,.2f}")
         
         with col2:
-            expenses = abs(df[df['amount'] < 0]['amount'].sum()) if (df['amount'] < 0).any() else 0
-            st.metric("💸 Total Expenses", f"${expenses:,.2f}")
+            st.metric("💸 Total Expenses", f"${metrics['total_expenses']:,.2f}")
         
         with col3:
-            net = income - expenses
-            st.metric("🏦 Net Amount", f"${net:,.2f}")
+            st.metric("🏦 Net Amount", f"${metrics['net_amount']:,.2f}")
         
         with col4:
-            avg_transaction = df['amount'].mean()
-            st.metric("📊 Avg Transaction", f"${avg_transaction:,.2f}")
+            st.metric("📊 Avg Transaction", f"${metrics['avg_transaction']:,.2f}")
     
     # Transaction breakdown
     st.subheader("🔍 Transaction Analysis")
     
     if 'transaction_type' in df.columns:
+        # Cached per frame, so sort/filter widget reruns skip both counts
+        type_counts, top_merchants = _transaction_breakdown(df)
         col1, col2 = st.columns(2)
         
         with col1:
             st.write("**Transaction Type Breakdown:**")
-            type_counts = df['transaction_type'].value_counts()
             for t_type, count in type_counts.items():
                 st.write(f"• {t_type}: {count} transactions")
         
@@ -378,11 +526,8 @@ def render_analytics_page():
             if 'description' in df.columns:
                 st.write("**Most Frequent Merchants:**")
                 # Get top merchants (expenses only)
-                expenses = df[df['amount'] < 0] if (df['amount'] < 0).any() else pd.DataFrame()
-                if not expenses.empty:
-                    top_merchants = expenses['description'].value_counts().head(5)
-                    for merchant, count in top_merchants.items():
-                        st.write(f"• {merchant}: {count} times")
+                for merchant, count in top_merchants.items():
+                    st.write(f"• {merchant}: {count} times")
     
     # Raw data view
     st.subheader("📋 All Transactions")
@@ -396,41 +541,37 @@ def render_analytics_page():
     with col3:
         show_rows = st.selectbox("Show rows:", [10, 25, 50, 100, "All"])
     
-    # Apply filters and sorting
-    filtered_df = df.copy()
+    # Apply filters and sorting (masks and sorts already return new frames)
+    view = df
     
     if filter_type == "Income" and 'amount' in df.columns:
-        filtered_df = filtered_df[filtered_df['amount'] > 0]
+        view = view[is_income]
     elif filter_type == "Expenses" and 'amount' in df.columns:
-        filtered_df = filtered_df[filtered_df['amount'] < 0]
+        view = view[is_expense]
     
     # Apply sorting
-    if sort_by == "Date (newest first)" and 'date' in filtered_df.columns:
-        filtered_df = filtered_df.sort_values('date', ascending=False)
-    elif sort_by == "Amount (highest first)" and 'amount' in filtered_df.columns:
-        filtered_df = filtered_df.sort_values('amount', ascending=False)
-    elif sort_by == "Description" and 'description' in filtered_df.columns:
-        filtered_df = filtered_df.sort_values('description')
+    sort_map = {
+        "Date (newest first)": ('date', False),
+        "Amount (highest first)": ('amount', False),
+        "Description": ('description', True),
+    }
+    sort_col, ascending = sort_map[sort_by]
+    if sort_col in view.columns:
+        if sort_col == 'date' and view['date'].is_monotonic_increasing:
+            # Frames arrive date-sorted, so newest first is just a reversal
+            view = view.iloc[::-1]
+        else:
+            view = view.sort_values(sort_col, ascending=ascending, kind='stable')
     
     # Limit rows
     if show_rows != "All":
-        filtered_df = filtered_df.head(show_rows)
+        view = view.head(show_rows)
+    elif len(view) > MAX_DISPLAY_ROWS and not st.checkbox(f"Show all {len(view):,} rows"):
+        st.caption(f"Showing the first {MAX_DISPLAY_ROWS:,} of {len(view):,} rows.")
+        view = view.head(MAX_DISPLAY_ROWS)
     
     # Prepare display
-    display_cols = ['date', 'description', 'amount', 'transaction_type']
-    available_cols = [col for col in display_cols if col in filtered_df.columns]
-    
-    if available_cols:
-        display_df = filtered_df[available_cols].copy()
-        
-        # Format for display
-        if 'date' in display_df.columns:
-            display_df['date'] = pd.to_datetime(display_df['date']).dt.strftime('%Y-%m-%d')
-        if 'amount' in display_df.columns:
-            display_df['amount'] = display_df['amount'].apply(lambda x: f"${x:,.2f}")
-        
-        st.dataframe(display_df, use_container_width=True, height=400)
-    else:
+    if not _render_transactions(view, height=400):
         st.warning("No data available to display")
 
 if __name__ == "__main__":